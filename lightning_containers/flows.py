@@ -1,3 +1,5 @@
+import os
+
 from prefect import flow
 from tasks import *
 from tasks.analytics import (
@@ -12,32 +14,10 @@ end_date = "02/21/2023"
 
 
 # 24 hours :test:
-hours = [
-    "00",
-    "01",
-    "02",
-    "03",
-    "04",
-    "05",
-    "06",
-    "07",
-    "08",
-    "09",
-    "10",
-    "11",
-    "12",
-    "13",
-    "14",
-    "15",
-    "16",
-    "17",
-    "18",
-    "19",
-    "20",
-    "21",
-    "22",
-    "23",
-]
+hours = tuple(f"{x:02d}" for x in range(24))
+# checked on import, so a bad hour fails before the retried flows start
+if not {int(hour) for hour in hours} <= set(range(24)):
+    raise ValueError("Hour must be between 00-23")
 
 
 @flow(retries=3, retry_delay_seconds=15, log_prints=True)
@@ -52,9 +32,11 @@ def cluster_analysis():
     p = preprocessor()
     k = kmeans_cluster(p)
     try:
-        s = Silhouette_evaluator(k)
+        best_k = Silhouette_evaluator(k)
     except:
-        e = elbow_evaluator(k)
+        best_k = elbow_evaluator(k)
+    # evaluators may return a cached k, so the flow applies it
+    os.environ["NUM_OF_CLUSTERS"] = str(best_k)
     return "Clustering Flow completed!"
 
 
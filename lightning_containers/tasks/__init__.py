@@ -5,11 +5,7 @@ import pandas as pd
 from tasks.etl import source, transformations, sink
 
 
-def ingestion_config():
-    # Optional ETL parameters:
-    year = os.getenv("GOES_YEAR")
-    day_of_year = os.getenv("GOES_DOY")
-    hour = os.getenv("GOES_HOUR")
+def ingestion_config(year: str, day_of_year: str, hour: str):
     # Required parameters:
     bucket_name = os.getenv("S3_BUCKET")  # Satellite i.e. GOES-18
     product_line = os.getenv("PRODUCT")  # Product line id i.e. ABI...
@@ -20,25 +16,28 @@ def ingestion_config():
 
 def ingestion(start_date: str, end_date: str, hours: [str]):
     """Collects the data"""
-
-    for single_date in pd.date_range(start_date, end_date, freq="D"):
-
-        for single_hour in hours:
-            single_hour = single_hour.rjust(2, "0")
-            print(
-                f"Start date: {start_date}; End date: {end_date}; Hour: {single_hour}"
-            )
-            # Export env vars
-            os.environ["GOES_YEAR"] = single_date.strftime("%Y")
-            os.environ["GOES_DOY"] = single_date.strftime("%j")
-            os.environ["GOES_HOUR"] = str(single_hour)
-            # config file string
-            prefix, bucket_name = ingestion_config()
-            print(f"Prefix: {prefix}; Bucket: {bucket_name}")
-            try:
-                # ETL tasks
-                s = source()
-                t = transformations(s)
-                s = sink(t)
-            except Exception as e:
-                print(f"Error loading files from {prefix}")
+    # every selected hour between the start and end dates, built in one pass
+    selected_hours = {int(single_hour) for single_hour in hours}
+    intervals = pd.date_range(
+        pd.Timestamp(start_date).normalize(),
+        pd.Timestamp(end_date).normalize() + pd.Timedelta(hours=23),
+        freq="H",
+    )
+    intervals = intervals[intervals.hour.isin(selected_hours)]
+
+    for single_interval in intervals:
+        # pass the hour explicitly rather than through os.environ
+        year = single_interval.strftime("%Y")
+        day_of_year = single_interval.strftime("%j")
+        single_hour = single_interval.strftime("%H")
+        print(f"Start date: {start_date}; End date: {end_date}; Hour: {single_hour}")
+        # config file string
+        prefix, bucket_name = ingestion_config(year, day_of_year, single_hour)
+        print(f"Prefix: {prefix}; Bucket: {bucket_name}")
+        try:
+            # ETL tasks
+            s = source(year=year, day_of_year=day_of_year, hour=single_hour)
+            t = transformations(s)
+            s = sink(t)
+        except Exception as e:
+            print(f"Error loading files from {prefix}")
@@ -1,11 +1,19 @@
 import os
+import hashlib
 
 import sqlite3 as db
 import pandas as pd
 
 from prefect import task
-from .clustering import preprocess, kmeans_model, sil_evaluation, elb_evaluation
+from .clustering import (
+    preprocess,
+    kmeans_model,
+    sil_evaluation,
+    elb_evaluation,
+    elb_optimal_k,
+)
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 # Date range
@@ -15,25 +23,56 @@ end_date = str(dt)
 hours = dt.strftime("%H")
 
 
+def frame_cache_key(context, parameters):
+    # hash frame contents rather than pickling the whole frame
+    digest = hashlib.blake2b(digest_size=16)
+    for name, value in sorted(parameters.items()):
+        digest.update(name.encode())
+        if isinstance(value, pd.DataFrame):
+            for column, series in value.items():
+                digest.update(str(column).encode())
+                if pd.api.types.is_numeric_dtype(series.dtype):
+                    # numeric columns hash straight from their buffer
+                    digest.update(series.to_numpy().tobytes())
+                else:
+                    row_hashes = pd.util.hash_pandas_object(series, index=False)
+                    digest.update(row_hashes.to_numpy().tobytes())
+        else:
+            digest.update(repr(value).encode())
+    return f"{context.task.name}-{digest.hexdigest()}"
+
+
+@lru_cache(maxsize=4)
+def db_open(db_path: str):
+    # one connection per database file, reused by the tasks in turn
+    return db.connect(db_path, check_same_thread=False)
+
+
 def db_connect(process: str):
     basepath = Path(__file__).resolve().parent.parent.parent.parent
     load_path = Path("data/Load")
     dest_folder = os.path.join(basepath, load_path)
-
-    os.chdir(dest_folder)
     db_path = os.path.join(dest_folder, "glmFlash.db")
 
     if process == "preprocess":
         # conn string for preprocess data
-        conn = db.connect(db_path)
-        df = pd.read_sql_query("SELECT * FROM tbl_flash", conn)
+        conn = db_open(db_path)
+        # project the clustering columns and keep the first row per timestamp
+        df = pd.read_sql_query(
+            """
+            SELECT ts_date, longitude, latitude
+            FROM tbl_flash
+            WHERE rowid IN (SELECT MIN(rowid) FROM tbl_flash GROUP BY ts_date)
+            """,
+            conn,
+        )
         return df
 
     elif process == "model":
         # conn string for model data
         try:
             # create the db connection
-            conn = db.connect(db_path)
+            conn = db_open(db_path)
         except Exception as db_err:
             # connection error
             print(f"Connection error on: {db_path}")
@@ -65,8 +104,11 @@ def preprocessor():
 def kmeans_cluster(preprocessor: pd.DataFrame):
     k = int(os.getenv("NUM_OF_CLUSTERS", 12))
     print(f"Starting cluster model, k={k}...")
+    basepath = Path(__file__).resolve().parent.parent.parent.parent
+    model_dir = os.path.join(basepath, Path("data/Models"))
+    os.makedirs(model_dir, exist_ok=True)
     results = []
-    clusters = kmeans_model(preprocessor, k)
+    clusters = kmeans_model(preprocessor, k, model_dir)
     results = pd.DataFrame(clusters)
     print(f"Generated cluster model ...")
     # save clusters to db
@@ -80,16 +122,18 @@ def kmeans_cluster(preprocessor: pd.DataFrame):
     description="Silhouette coefficient score 'k'.",
     retries=3,
     retry_delay_seconds=15,
+    cache_key_fn=frame_cache_key,
+    cache_expiration=timedelta(hours=24),
 )
-def Silhouette_evaluator(kmeans_cluster: pd.DataFrame):
+def Silhouette_evaluator(kmeans_cluster: pd.DataFrame) -> int:
     print(f"Starting silhouette evaluation ...")
     sil_coefficients = sil_evaluation(kmeans_cluster)
     results = sil_coefficients.set_index("k", drop=True)
-    k_max = results["silhouette_coefficient"].argmax()
-    print(f"Silhoutte coefficients: {results}")
-    os.environ["NUM_OF_CLUSTERS"] = str(k_max)
+    k_max = int(results["silhouette_coefficient"].idxmax())
+    print(f"Silhoutte coefficients: {results}; best k={k_max}")
     # todo: save evaluations db
-    return results
+    # return k rather than setting it here: a cache hit skips this body
+    return k_max
 
 
 @task(
@@ -97,12 +141,14 @@ def Silhouette_evaluator(kmeans_cluster: pd.DataFrame):
     description="Elbow method score 'k'.",
     retries=3,
     retry_delay_seconds=15,
+    cache_key_fn=frame_cache_key,
+    cache_expiration=timedelta(hours=24),
 )
-def elbow_evaluator(kmeans_cluster: pd.DataFrame):
+def elbow_evaluator(kmeans_cluster: pd.DataFrame) -> int:
     print(f"Starting elbow evaluation: {kmeans_cluster}")
-    results = []
     elb_sse = elb_evaluation(kmeans_cluster)
-    results.append(elb_sse)
-    print(f"Elbow SSE ...")
+    k_elbow = elb_optimal_k(elb_sse)
+    print(f"Elbow SSE: {elb_sse}; optimal k={k_elbow}")
     # todo: save evaluations db
-    return results
+    # return k rather than setting it here: a cache hit skips this body
+    return k_elbow
@@ -1,58 +1,199 @@
+import os
+import glob
+import hashlib
+
+import numpy as np
 import pandas as pd
 
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+# scikit-learn and joblib are imported inside the functions that use them,
+# so importing the flows for ETL alone does not pay their import cost
+
+# sweep with mini-batches above this many rows
+MINIBATCH_MIN_ROWS = 100_000
+# rows sampled per silhouette score, which is O(n^2) in rows
+SILHOUETTE_SAMPLE_SIZE = 10_000
+
+
+def use_gpu() -> bool:
+    """Whether the USE_GPU flag asks for cuML k-means."""
+    return os.getenv("USE_GPU", "false").lower() in ("1", "true")
+
+
+def kmeans_backend() -> str:
+    """The library kmeans_estimator fits with, "cuml" or "sklearn"."""
+    if use_gpu():
+        try:
+            import cuml  # noqa: F401
+        except ImportError:
+            print("cuML not available, falling back to scikit-learn KMeans.")
+        else:
+            return "cuml"
+    return "sklearn"
+
+
+def kmeans_estimator(n_clusters: int, **kmeans_kwargs):
+    """
+    Build a k-means estimator, on the GPU via cuML when USE_GPU is set.
+    """
+    if kmeans_backend() == "cuml":
+        from cuml.cluster import KMeans as cuKMeans
+
+        # cuML seeds with scalable k-means++ and has no elkan variant
+        if isinstance(kmeans_kwargs.get("init"), str):
+            kmeans_kwargs.pop("init")
+        kmeans_kwargs.pop("algorithm", None)
+        return cuKMeans(n_clusters=n_clusters, **kmeans_kwargs)
+
+    from sklearn.cluster import KMeans
+
+    return KMeans(n_clusters=n_clusters, **kmeans_kwargs)
 
 
 def preprocess(df: pd.DataFrame) -> pd.DataFrame:
     """Preprocess the data"""
-    # remove duplicates
-    df.drop_duplicates(subset=["ts_date"], inplace=True)
-    geo_df = df
-    return geo_df
+    # duplicates are removed by the db_connect("preprocess") query; the
+    # coordinates keep their stored float64 values, which link the results
+    # table back to tbl_flash, and feature_array casts for k-means
+    return df
 
 
-def kmeans_model(data: pd.DataFrame, num_clusters: int):
+def feature_array(data: pd.DataFrame) -> np.ndarray:
+    """
+    Coordinates as a contiguous float32 array, the layout KMeans fits fastest.
+    """
+    return np.ascontiguousarray(
+        data.loc[:, ["longitude", "latitude"]].to_numpy(dtype=np.float32)
+    )
+
+
+def kmeans_model(data: pd.DataFrame, num_clusters: int, model_dir: str = None):
     """
     Fit data to kmeans cluster algorithm.
+    A model saved in model_dir for the same features and k is reused.
+    Uses one seeded k-means++ init: extra restarts cost a full fit each and
+    rarely change the clusters on 2-d coordinates.
     """
+    import joblib
+
     X = data.loc[:, ["longitude", "latitude"]]
+    # contiguous float32 halves the bytes moved per distance pass
+    features = feature_array(X)
 
     kmeans_kwargs = {
         "init": "k-means++",
-        "n_init": 10,
+        "n_init": 1,
         "max_iter": 100,
+        "algorithm": "elkan",
         "random_state": 60,
     }
 
-    kmeans = KMeans(n_clusters=num_clusters, **kmeans_kwargs)
-    X["Cluster"] = kmeans.fit_predict(X)
+    model_path = None
+    if model_dir is not None:
+        # fingerprint the features and how they are fit; an unchanged input
+        # only needs a predict, and a cuML pickle is never loaded on a CPU run
+        key = hashlib.blake2b(features.tobytes(), digest_size=16)
+        key.update(f"{kmeans_backend()}:{sorted(kmeans_kwargs.items())}".encode())
+        model_name = f"kmeans_{num_clusters}_{key.hexdigest()}.joblib"
+        model_path = os.path.join(model_dir, model_name)
+
+    if model_path is not None and os.path.exists(model_path):
+        kmeans = joblib.load(model_path)
+        X["Cluster"] = np.asarray(kmeans.predict(features))
+    else:
+        kmeans = kmeans_estimator(num_clusters, **kmeans_kwargs)
+        X["Cluster"] = np.asarray(kmeans.fit_predict(features))
+        if model_path is not None:
+            joblib.dump(kmeans, model_path, compress=3)
+            # keep only the latest model per k
+            for stale in glob.glob(
+                os.path.join(model_dir, f"kmeans_{num_clusters}_*.joblib")
+            ):
+                if stale != model_path:
+                    os.remove(stale)
     X["Cluster"] = X["Cluster"].astype("category")
     return X
 
 
-def sil_evaluation(data: pd.DataFrame):
+# the last k-means sweep, shared by the silhouette and elbow evaluations
+_sweep_cache = {}
+
+
+def sweep_kmeans(data: np.ndarray, ks: range) -> dict:
     """
-    Evaluate the k-means silhouette coefficient.
+    Fit one k-means model per k in ks, reusing the last sweep on the same data.
     """
-    data = data.loc[:, ["longitude", "latitude"]]
+    from sklearn.cluster import MiniBatchKMeans
 
+    key = (hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest(), tuple(ks))
+    if key in _sweep_cache:
+        return _sweep_cache[key]
+
+    # single seeded init is enough for a sweep; elkan skips
+    # distance computations using the triangle inequality
     kmeans_kwargs = {
         "init": "k-means++",
-        "n_init": 10,
+        "n_init": 1,
         "max_iter": 50,
+        "algorithm": "elkan",
         "random_state": 60,
     }
 
-    # holds the silhouette coefficients for each k
-    silhouette_coefficients = {}
+    minibatch_kwargs = {
+        "init": "k-means++",
+        "n_init": 1,
+        "max_iter": 100,
+        "batch_size": 4096,
+        "random_state": 60,
+    }
 
-    # start at 2 clusters for silhouette coefficient
-    for k in range(2, 24):
-        kmeans = KMeans(n_clusters=k, **kmeans_kwargs)
+    models = {}
+    kmeans = None
+    for k in ks:
+        if kmeans is not None:
+            # warm start from the k-1 centers plus their worst fitted point
+            centers = np.asarray(kmeans.cluster_centers_, dtype=np.float32)
+            labels = np.asarray(kmeans.labels_)
+            farthest = ((data - centers[labels]) ** 2).sum(axis=1).argmax()
+            kmeans_kwargs["init"] = minibatch_kwargs["init"] = np.vstack(
+                [centers, data[farthest]]
+            )
+        if len(data) > MINIBATCH_MIN_ROWS:
+            kmeans = MiniBatchKMeans(n_clusters=k, **minibatch_kwargs)
+        else:
+            kmeans = kmeans_estimator(k, **kmeans_kwargs)
         kmeans.fit(data)
-        score = silhouette_score(data, kmeans.labels_)
-        silhouette_coefficients[k] = score
+        models[k] = kmeans
+
+    _sweep_cache.clear()
+    _sweep_cache[key] = models
+    return models
+
+
+def sil_evaluation(data: pd.DataFrame):
+    """
+    Evaluate the k-means silhouette coefficient.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.metrics import silhouette_score
+
+    data = feature_array(data)
+    models = sweep_kmeans(data, range(1, 24))
+
+    # start at 2 clusters for silhouette coefficient; scores are
+    # independent, so compute them across cores
+    ks = range(2, 24)
+    scores = Parallel(n_jobs=-1)(
+        delayed(silhouette_score)(
+            data,
+            np.asarray(models[k].labels_),
+            sample_size=min(SILHOUETTE_SAMPLE_SIZE, len(data)),
+            random_state=60,
+        )
+        for k in ks
+    )
+
+    # holds the silhouette coefficients for each k
+    silhouette_coefficients = dict(zip(ks, scores))
 
     sil_df = pd.DataFrame(
         list(silhouette_coefficients.items()), columns=["k", "silhouette_coefficient"]
@@ -65,21 +206,22 @@ def elb_evaluation(data: pd.DataFrame):
     """
     Evaluate the k-means elbow method, sum of squared error.
     """
-
-    kmeans_kwargs = {
-        "init": "k-means++",
-        "n_init": 10,
-        "max_iter": 50,
-        "random_state": 60,
-    }
-
-    # A list holds the sum of squared distance for each k
-    elb_sse = []
+    models = sweep_kmeans(feature_array(data), range(1, 24))
 
     # Return SSE for each k
-    for k in range(1, 24):
-        kmeans = KMeans(n_clusters=k, **kmeans_kwargs)
-        kmeans.fit(data)
-        elb_sse.append(kmeans.inertia_)
+    elb_sse = [models[k].inertia_ for k in range(1, 24)]
 
     return elb_sse
+
+
+def elb_optimal_k(elb_sse: list) -> int:
+    """
+    Pick the elbow of an SSE curve, the k with the largest second difference.
+    """
+    # elb_sse[i] holds the SSE for k = i + 1
+    best_k, best_curv = 1, float("-inf")
+    for i in range(1, len(elb_sse) - 1):
+        curv = elb_sse[i - 1] - 2 * elb_sse[i] + elb_sse[i + 1]
+        if curv > best_curv:
+            best_curv, best_k = curv, i + 1
+    return best_k
@@ -1,7 +1,9 @@
 import os
 import shutil
+import multiprocessing
 import warnings
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from prefect import task, get_run_logger
 from datetime import datetime, timedelta
 from .extract import extract_s3
@@ -16,13 +18,18 @@ from tqdm import tqdm
 
 warnings.simplefilter("ignore")
 
+# concurrent S3 downloads per hour
+S3_MAX_WORKERS = 32
 
-def etl_config(process: str):
-    # optional ETL parameters:
+
+def etl_config(
+    process: str, year: str = None, day_of_year: str = None, hour: str = None
+):
+    # optional ETL parameters, passed in or read from env:
     dt = datetime.utcnow() - timedelta(hours=1)
-    year = os.getenv("GOES_YEAR", dt.strftime("%Y"))
-    day_of_year = os.getenv("GOES_DOY", dt.strftime("%j"))
-    hour = os.getenv("GOES_HOUR", dt.strftime("%H"))
+    year = year or os.getenv("GOES_YEAR", dt.strftime("%Y"))
+    day_of_year = day_of_year or os.getenv("GOES_DOY", dt.strftime("%j"))
+    hour = hour or os.getenv("GOES_HOUR", dt.strftime("%H"))
     # required parameters:
     bucket_name = os.getenv("S3_BUCKET", "noaa-goes18")  # Satellite i.e. GOES-18
     product_line = os.getenv("PRODUCT", "GLM-L2-LCFA")  # Product line id i.e. ABI...
@@ -35,57 +42,93 @@ def etl_config(process: str):
         src_folder = prefix
         dest_folder = os.path.join(basepath, ext_path)
         # create folder if not existing
-        if not os.path.exists(dest_folder):
-            os.makedirs(dest_folder)
+        os.makedirs(dest_folder, exist_ok=True)
     elif process == "transform":
         src_folder = os.path.join(basepath, ext_path)
         dest_folder = os.path.join(basepath, trf_path)
         # create folder if not existing
-        if not os.path.exists(dest_folder):
-            os.makedirs(dest_folder)
+        os.makedirs(dest_folder, exist_ok=True)
     elif process == "load":
         src_folder = os.path.join(basepath, trf_path)
         dest_folder = os.path.join(basepath, lod_path)
         # create folder if not existing
-        if not os.path.exists(dest_folder):
-            os.makedirs(dest_folder)
+        os.makedirs(dest_folder, exist_ok=True)
     else:
         print(f"Process {process} not found!")
 
     return src_folder, bucket_name, dest_folder
 
 
+def link_or_copy(filename: str, dest_folder: str, same_device: bool = True):
+    # a hardlink publishes the file without rewriting its bytes
+    dest_file = os.path.join(dest_folder, os.path.basename(filename))
+    if os.path.exists(dest_file):
+        if os.path.samefile(filename, dest_file):
+            raise shutil.SameFileError(f"{filename} and {dest_file} are the same")
+        os.remove(dest_file)
+    if not same_device:
+        # folders on different filesystems can only be copied
+        shutil.copy(filename, dest_file)
+        return
+    try:
+        os.link(filename, dest_file)
+    except OSError:
+        # filesystem without hardlink support
+        shutil.copy(filename, dest_file)
+
+
+def hour_cache_key(context, parameters):
+    # cache only explicit hours; env driven runs default to the latest hour
+    if parameters.get("hour") is None:
+        return None
+    prefix, bucket_name, _ = etl_config(process="extract", **parameters)
+    return f"{context.task.name}-{bucket_name}/{prefix}"
+
+
 @task(
     name="Source extract",
     description="Extract GOES netCDF files from s3 bucket.",
     retries=2,
     retry_delay_seconds=3,
+    cache_key_fn=hour_cache_key,
+    cache_expiration=timedelta(hours=24),
 )
-def source():
+def source(year: str = None, day_of_year: str = None, hour: str = None):
     logger = get_run_logger()
     # config file string
-    prefix, bucket_name, extract_folder = etl_config(process="extract")
-    # navigate to folder
-    os.chdir(extract_folder)
+    prefix, bucket_name, extract_folder = etl_config(
+        process="extract", year=year, day_of_year=day_of_year, hour=hour
+    )
     results = []
     logger.info(f"Starting file extracts for: {prefix}")
-    # configure s3 no sign in credential
-    s3 = client("s3", config=Config(signature_version=UNSIGNED))
-    # list existing files in buckets
-    for files in tqdm(
-        s3.list_objects(Bucket=bucket_name, Prefix=prefix)["Contents"],
-        total=180,
-        ascii=" >=",
-        desc=f"Extract {prefix}",
-    ):
-        # download file from list
-        filepath = files["Key"]
-        path, filename = os.path.split(filepath)
-        logger.info(
-            f"Dowloading {filename} to {os.path.join(extract_folder, filename)}"
-        )
-        s3_extract = extract_s3(bucket_name, prefix, filename, filepath)
-        results.append(s3_extract)
+    # configure s3 no sign in credential; one client shared by all threads
+    s3 = client(
+        "s3",
+        config=Config(signature_version=UNSIGNED, max_pool_connections=S3_MAX_WORKERS),
+    )
+    # list existing files in buckets page by page, downloading as they arrive
+    paginator = s3.get_paginator("list_objects_v2")
+    pages = paginator.paginate(Bucket=bucket_name, Prefix=prefix)
+    with ThreadPoolExecutor(max_workers=S3_MAX_WORKERS) as executor:
+        downloads = []
+        for files in (obj for page in pages for obj in page.get("Contents", [])):
+            # download file from list
+            filepath = files["Key"]
+            path, filename = os.path.split(filepath)
+            dest_file = os.path.join(extract_folder, filename)
+            logger.info(f"Dowloading {filename} to {dest_file}")
+            downloads.append(
+                executor.submit(
+                    extract_s3, bucket_name, prefix, dest_file, filepath, s3
+                )
+            )
+        for s3_extract in tqdm(
+            as_completed(downloads),
+            total=len(downloads),
+            ascii=" >=",
+            desc=f"Extract {prefix}",
+        ):
+            results.append(s3_extract.result())
     return results
 
 
@@ -98,24 +141,44 @@ def source():
 def transformations(source):
     # config file string
     extract_folder, bucket_name, transform_folder = etl_config(process="transform")
-    glm_files = [f for f in os.listdir(extract_folder) if f.endswith(".nc")]
+    # convert only the granules this hour's source task downloaded
+    downloaded = {name for s3_extract in source for name in s3_extract[0]}
+    glm_files = [
+        f for f in os.listdir(extract_folder) if f.endswith(".nc") and f in downloaded
+    ]
     # exit if source folder not existing
     if not os.path.exists(extract_folder):
         pass
-    # empty sink folder or recreate
-    if not os.path.exists(transform_folder):
-        os.makedirs(transform_folder)
-    else:
-        filelist = [f for f in os.listdir(transform_folder) if f.endswith(".csv")]
-        for f in filelist:
-            os.remove(os.path.join(transform_folder, f))
+    # empty sink folder; etl_config already created it
+    filelist = [f for f in os.listdir(transform_folder) if f.endswith(".csv")]
+    for f in filelist:
+        os.remove(os.path.join(transform_folder, f))
     results = []
+    if not glm_files:
+        print(f"No new files to convert in: {extract_folder}")
+        return results
     print(f"Starting file conversions for: {extract_folder}")
-    # Convert glm files into one time series dataframe
-    for filename in tqdm(glm_files, desc=f"transform {extract_folder}"):
-        print(f"Converting {filename} to csv")
-        csv_transform = transform_file(extract_folder, transform_folder, filename)
-        results.append(csv_transform)
+    # Convert glm files into csv, one granule per worker process. Workers are
+    # spawned, not forked: this task's process runs Prefect and S3 threads,
+    # and a forked child can inherit one of their locks mid-acquire.
+    with ProcessPoolExecutor(
+        max_workers=min(os.cpu_count() or 1, len(glm_files)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        conversions = []
+        for filename in glm_files:
+            print(f"Converting {filename} to csv")
+            conversions.append(
+                executor.submit(
+                    transform_file, extract_folder, transform_folder, filename
+                )
+            )
+        for csv_transform in tqdm(
+            as_completed(conversions),
+            total=len(conversions),
+            desc=f"transform {extract_folder}",
+        ):
+            results.append(csv_transform.result())
     # csv_transform -> results
     return results
 
@@ -131,12 +194,14 @@ def sink(transformations):
     transform_folder, bucket_name, load_folder = etl_config(process="load")
     glm_files = [f for f in os.listdir(transform_folder) if f.endswith(".csv")]
     print(f"Starting files load for: {transform_folder}")
+    # check once whether hardlinks can cross from transform to load
+    same_device = os.stat(transform_folder).st_dev == os.stat(load_folder).st_dev
     # navigate to folder
     os.chdir(transform_folder)
     for filename in glm_files:
         try:
-            # copy to folder
-            shutil.copy(filename, load_folder)
+            # link to folder
+            link_or_copy(filename, load_folder, same_device)
         # if source and sink are same
         except shutil.SameFileError:
             print("Source and sink represents the same file.")
@@ -146,12 +211,8 @@ def sink(transformations):
         # for other errors
         except:
             print(f"Error copying {filename} to {load_folder}.")
-        try:
-            # rename files
-            os.rename(filename, f"{filename}.trm")
-        # file already exists
-        except FileExistsError:
-            print(f"Error renaming {filename}; file exists.")
+        # rename files, replacing any earlier marker atomically
+        os.replace(filename, f"{filename}.trm")
     results = []
     print(f"Load {load_folder} files to sink.")
     # navigate to folder
@@ -9,12 +9,16 @@ from botocore import UNSIGNED, exceptions
 from boto3 import client
 
 
-def extract_s3(bucket: str, prefix: str, filename: str, filepath: str) -> pd.DataFrame:
+def extract_s3(
+    bucket: str, prefix: str, filename: str, filepath: str, s3=None
+) -> pd.DataFrame:
     """
     Downloads GOES netCDF files from s3 buckets
     prefix = s3://<weather_satellite>/<product_line>/<year>/<day_of_year>/<hour>/<OR_...*.nc>
+    Pass a shared s3 client to avoid building one per file.
     """
-    s3 = client("s3", config=Config(signature_version=UNSIGNED))
+    if s3 is None:
+        s3 = client("s3", config=Config(signature_version=UNSIGNED))
     try:
         s3.download_file(Bucket=bucket, Filename=filename, Key=filepath)
     except exceptions.ClientError as err:
@@ -22,6 +26,6 @@ def extract_s3(bucket: str, prefix: str, filename: str, filepath: str) -> pd.Dat
             print(f"{filename} cannot be located.")
         else:
             raise
-    # List files downloaded
-    df_extract = pd.DataFrame(os.listdir())
+    # downloaded file
+    df_extract = pd.DataFrame([os.path.basename(filename)])
     return df_extract
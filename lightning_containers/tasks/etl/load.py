@@ -1,11 +1,83 @@
 #!/usr/bin/env python
 
 import os
-import shutil
 import glob
 import sqlite3 as db
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from pyarrow import csv as pacsv
+
+EVENT_COLUMNS = ["id", "ts_date", "latitude", "longitude", "energy"]
+# tbl_flash as pandas' to_sql first created it
+FLASH_COLUMNS = EVENT_COLUMNS + ["date_time", "date", "h_time"]
+FLASH_DDL = """
+    CREATE TABLE IF NOT EXISTS tbl_flash (
+        id INTEGER,
+        ts_date TEXT,
+        latitude REAL,
+        longitude REAL,
+        energy REAL,
+        date_time TIMESTAMP,
+        date DATE,
+        h_time TIME
+    )
+    """
+FLASH_INSERT = (
+    f"INSERT INTO tbl_flash ({', '.join(FLASH_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(FLASH_COLUMNS))})"
+)
+
+
+def read_event_csv(filename: str) -> pd.DataFrame:
+    """
+    Read one transformed event file and add its date/time columns.
+    """
+    # ts_date stays text so the stored strings match earlier loads;
+    # include_columns makes the reader itself reject files missing a column
+    table = pacsv.read_csv(
+        filename,
+        convert_options=pacsv.ConvertOptions(
+            column_types={"ts_date": pa.string()},
+            include_columns=EVENT_COLUMNS,
+        ),
+    )
+    # ts_date is always ISO 8601 text; arrow parses it in C++ (raising on a
+    # malformed value) and formats the derived columns the way they are
+    # stored: "YYYY-MM-DD HH:MM:SS.ffffff", "YYYY-MM-DD", "HH:MM:SS.ffffff"
+    date_time = pc.cast(table["ts_date"], pa.timestamp("us"))
+    for name, fmt in (
+        ("date_time", "%Y-%m-%d %H:%M:%S"),
+        ("date", "%Y-%m-%d"),
+        ("h_time", "%H:%M:%S"),
+    ):
+        table = table.append_column(name, pc.strftime(date_time, format=fmt))
+    return table.to_pandas()
+
+
+def read_event_files(glm_files: list, max_workers: int):
+    """
+    Yield (filename, frame) in order, parsing at most max_workers files ahead.
+    """
+    pending = iter(glm_files)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # the C parser releases the GIL, so queued files parse side by side
+        in_flight = deque(
+            (filename, pool.submit(read_event_csv, filename))
+            for filename in islice(pending, max_workers)
+        )
+        while in_flight:
+            filename, future = in_flight.popleft()
+            next_file = next(pending, None)
+            if next_file is not None:
+                in_flight.append((next_file, pool.submit(read_event_csv, next_file)))
+            yield filename, future.result()
 
 
 def load_tbl(load_folder: str) -> pd.DataFrame:
@@ -15,23 +87,41 @@ def load_tbl(load_folder: str) -> pd.DataFrame:
     print("Loading geo data!")
     os.chdir(load_folder)
     glm_files = glob.glob(os.path.join(load_folder, "*event.csv"))
-    li = []
-    for filename in glm_files:
-        df = pd.read_csv(filename, index_col=None, header=0)
-        li.append(df)
-
-    df["date_time"] = pd.to_datetime(df["ts_date"])
-    df["date"] = df["date_time"].dt.date
-    df["h_time"] = df["date_time"].dt.time
+    if not glm_files:
+        print("No event files to load.")
+        return pd.DataFrame()
 
     conn = db.connect(f"{load_folder}/glmFlash.db")
+    # bulk-load settings, for this connection only; the journal mode and
+    # sync level stay at their defaults, as the load commits only once
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")
 
+    loaded = []
+    conn.execute("BEGIN")
     try:
-        # create the table "tbl_flash" from the csv files
-        df.to_sql("tbl_flash", conn, if_exists="append", index=False)
-    except Exception as db_err:
-        # table likely exist try insert
-        print("DB error!")
+        conn.execute(FLASH_DDL)
+        # insert each file as soon as it is parsed, all in one transaction
+        workers = min(8, os.cpu_count() or 1, len(glm_files))
+        for filename, df in read_event_files(glm_files, workers):
+            conn.executemany(FLASH_INSERT, df.itertuples(index=False, name=None))
+            loaded.append((filename, len(df)))
+        # the analytics de-duplication groups on ts_date; with rowid
+        # implicit in the index, it never has to touch the table
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_flash_ts_date ON tbl_flash(ts_date)"
+        )
+        conn.commit()
+    except db.Error as db_err:
+        # nothing is kept; the files stay for the next run
+        conn.rollback()
+        print(f"DB error! {db_err}")
+        loaded = []
+    except Exception:
+        # unreadable file: undo the partial load and leave every file
+        conn.rollback()
+        conn.close()
+        raise
 
     conn.execute(
         f"""
@@ -59,14 +149,15 @@ def load_tbl(load_folder: str) -> pd.DataFrame:
 
     conn.close()
 
-    os.makedirs("loaded")
-    try:
-        for filename in glm_files:
-            # Move loaded files
-            shutil.move(filename, "loaded")
-    except Exception as e:
-        print("Exception errors received.")
-    # cleanup
-    shutil.rmtree("loaded")
-
-    return df
+    # cleanup: unlink loaded files directly rather than moving them into a
+    # scratch folder only to delete it
+    for filename, _ in loaded:
+        try:
+            os.remove(filename)
+        except OSError:
+            print(f"Could not remove {filename}.")
+
+    return pd.DataFrame(
+        [(os.path.basename(filename), rows) for filename, rows in loaded],
+        columns=["filename", "rows"],
+    )
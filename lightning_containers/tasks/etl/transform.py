@@ -1,14 +1,26 @@
 #!/usr/bin/env python
 
 import os
-import shutil
 
 import netCDF4 as nc
+import numpy as np
 import pandas as pd
 
 from pathlib import Path
 
 
+def event_timestamps(time_offset: np.ndarray, time_units: str) -> pd.DatetimeIndex:
+    """
+    Convert CF time offsets ("<unit> since <epoch>") into timestamps.
+    """
+    # offset the epoch in one vectorized step instead of building a datetime
+    # object per event; microseconds match num2date's precision
+    time_unit, _, time_epoch = time_units.partition(" since ")
+    return (
+        pd.Timestamp(time_epoch) + pd.to_timedelta(time_offset, unit=time_unit)
+    ).round("us")
+
+
 def transform_file(
     extract_folder: str, transform_folder: str, filename: str
 ) -> pd.DataFrame:
@@ -16,32 +28,48 @@ def transform_file(
     Convert GOES netCDF files into csv
     """
     file_conn = Path(os.path.join(extract_folder, filename))
-    event_file = file_conn.with_suffix("").with_suffix(
-        ".event.csv"
-    )  # radiant event file
-    # create dataset
-    glm = nc.Dataset(file_conn, mode="r")
-    # variable definition
-    event_lat = glm.variables["event_lat"][:]
-    event_lon = glm.variables["event_lon"][:]
-    event_time = glm.variables["event_time_offset"]
-    event_energy = glm.variables["event_energy"][:]
-    dtime = nc.num2date(event_time[:], event_time.units)
-    # flatten multi-dimensional data into series
-    event_energy_ts = pd.Series(event_energy, index=dtime)
-    event_lat_ts = pd.Series(event_lat, index=dtime)
-    event_lon_ts = pd.Series(event_lon, index=dtime)
-    # combine series to dataframe
-    event_df = pd.concat(
-        [event_lat_ts, event_lon_ts, event_energy_ts], axis=1
-    ).reset_index()
-    # headers
-    with open(event_file, "w") as glm_file:
-        glm_file.write("id,ts_date,latitude,longitude,energy\n")
-    # write to csv
-    event_df.to_csv(event_file, index=True, header=False, mode="a")
-    # move files
-    shutil.move(event_file, transform_folder)
-    # list converted files
-    df_transform = pd.DataFrame(os.listdir())
+    # radiant event file, written straight into the transform folder
+    event_file = (
+        Path(transform_folder)
+        / file_conn.with_suffix("").with_suffix(".event.csv").name
+    )
+    # read dataset
+    with nc.Dataset(file_conn, mode="r") as glm:
+        # granules without events have nothing to convert or load
+        if glm.dimensions["number_of_events"].size == 0:
+            return pd.DataFrame()
+        # variable definition; masked reads flag _FillValue and valid_range
+        # on the packed values, and filling turns those events into NaN
+        event_lat = np.ma.filled(glm.variables["event_lat"][:], np.nan)
+        event_lon = np.ma.filled(glm.variables["event_lon"][:], np.nan)
+        event_energy = np.ma.filled(glm.variables["event_energy"][:], np.nan)
+        event_time = glm.variables["event_time_offset"]
+        time_offset = np.ma.filled(event_time[:], np.nan).astype("float64")
+        time_units = event_time.units
+    # drop fill values and out-of-range events (NaN fails every comparison)
+    valid = (
+        (np.abs(event_lat) <= 90)
+        & (np.abs(event_lon) <= 180)
+        & (event_energy >= 0)
+        & np.isfinite(time_offset)
+    )
+    if not valid.all():
+        event_lat = event_lat[valid]
+        event_lon = event_lon[valid]
+        event_energy = event_energy[valid]
+        time_offset = time_offset[valid]
+    dtime = event_timestamps(time_offset, time_units)
+    # one frame straight from the arrays
+    event_df = pd.DataFrame(
+        {
+            "ts_date": dtime,
+            "latitude": event_lat,
+            "longitude": event_lon,
+            "energy": event_energy,
+        }
+    )
+    # write to csv, header included, in a single pass
+    event_df.to_csv(event_file, index=True, index_label="id")
+    # converted file
+    df_transform = pd.DataFrame([event_file.name])
     return df_transform
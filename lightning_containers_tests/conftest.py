@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+
+import os
+import sys
+
+# the flows import their tasks as a top-level "tasks" package
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "lightning_containers")
+)
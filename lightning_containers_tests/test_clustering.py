@@ -1 +1,23 @@
 #!/usr/bin/env python
+
+from tasks.analytics.clustering import elb_optimal_k
+
+
+def test_elb_optimal_k_convex_curve():
+    """
+    Test the elbow of a convex SSE curve that flattens after k=4.
+    """
+    # SSE for k = 1..8
+    elb_sse = [100.0, 60.0, 30.0, 10.0, 8.0, 7.0, 6.5, 6.2]
+
+    assert elb_optimal_k(elb_sse) == 4
+
+
+def test_elb_optimal_k_sharp_elbow():
+    """
+    Test a curve that drops once, at k=2, then levels off.
+    """
+    # SSE for k = 1..4
+    elb_sse = [50.0, 10.0, 8.0, 7.0]
+
+    assert elb_optimal_k(elb_sse) == 2
@@ -1 +1,75 @@
 #!/usr/bin/env python
+
+import sqlite3
+
+import pyarrow as pa
+import pytest
+
+from tasks.etl.load import FLASH_DDL, load_tbl
+
+# Testing fixtures
+example_header = "id,ts_date,latitude,longitude,energy\n"
+example_rows = {
+    "OR_GLM-L2-LCFA_G18_s20230500000000.event.csv": (
+        "0,2023-02-19 00:00:01.500000,35.479317,-97.5164,2.1114539e-15\n"
+        "1,2023-02-19 10:00:00.250000,35.479317,-97.5164,4.3182375e-15\n"
+    ),
+    "OR_GLM-L2-LCFA_G18_s20230500000200.event.csv": (
+        "0,2023-02-19 18:00:00.000001,13.295715,-159.4406,1.0e-15\n"
+    ),
+}
+
+
+def write_event_files(folder, rows, header=example_header):
+    for name, body in rows.items():
+        (folder / name).write_text(header + body)
+
+
+def flash_rows(folder):
+    with sqlite3.connect(folder / "glmFlash.db") as conn:
+        return conn.execute("SELECT COUNT(*) FROM tbl_flash").fetchone()[0]
+
+
+def test_load_tbl_event_files(tmp_path, monkeypatch):
+    """
+    Test every row of every event file lands in tbl_flash.
+    """
+    monkeypatch.chdir(tmp_path)
+    write_event_files(tmp_path, example_rows)
+
+    summary = load_tbl(str(tmp_path))
+
+    assert flash_rows(tmp_path) == 3
+    assert sorted(summary["filename"]) == sorted(example_rows)
+    assert summary["rows"].sum() == 3
+    assert not list(tmp_path.glob("*event.csv"))
+
+
+def test_load_tbl_missing_column(tmp_path, monkeypatch):
+    """
+    Test a file missing a column rolls the load back and keeps every file.
+    """
+    monkeypatch.chdir(tmp_path)
+    with sqlite3.connect(tmp_path / "glmFlash.db") as conn:
+        conn.execute(FLASH_DDL)
+    write_event_files(tmp_path, example_rows)
+    write_event_files(
+        tmp_path,
+        {"OR_GLM-L2-LCFA_G18_s20230500000400.event.csv": "0,2023-02-19,1.0\n"},
+        header="id,ts_date,latitude\n",
+    )
+
+    with pytest.raises(pa.ArrowException):
+        load_tbl(str(tmp_path))
+
+    assert flash_rows(tmp_path) == 0
+    assert len(list(tmp_path.glob("*event.csv"))) == 3
+
+
+def test_load_tbl_no_event_files(tmp_path, monkeypatch):
+    """
+    Test an empty load folder returns an empty frame.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    assert load_tbl(str(tmp_path)).empty
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from tasks.etl.transform import event_timestamps
+
+# Testing fixtures
+example_units = "seconds since 2023-02-19 00:00:00.000"  # GLM event_time_offset
+
+
+def test_event_timestamps_from_cf_units():
+    """
+    Test offsets are added to the units epoch, rounded to microseconds.
+    """
+    dtime = event_timestamps(np.array([0.0, 1.5, 59.1234567]), example_units)
+
+    assert list(dtime.strftime("%Y-%m-%dT%H:%M:%S.%f")) == [
+        "2023-02-19T00:00:00.000000",
+        "2023-02-19T00:00:01.500000",
+        "2023-02-19T00:00:59.123457",
+    ]
+
+
+def test_event_timestamps_fill_value():
+    """
+    Test a NaN offset, a filled-out fill value, becomes NaT.
+    """
+    dtime = event_timestamps(np.array([np.nan, 2.0]), example_units)
+
+    assert dtime.isna().tolist() == [True, False]
@@ -14,6 +14,7 @@ setup(
         "scikit-learn==1.3.0",
         "SQLAlchemy==2.0.25",
         "tqdm==4.66.1",
+        "pyarrow==14.0.2",
         # frontend dependencies
         "streamlit==1.31.0",
         "plotly==5.18.0",